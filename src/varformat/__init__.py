@@ -16,7 +16,8 @@
 This package exposes the following functions (see docstrings for more information):
 - `format()`: very similar to `str.format`. Simple formatting from keyword arguments;
 - `vformat()`: takes a dict instead of keyword arguments, and allows other options for more configuration;
-- `parse()`: un-format a formatted string and get back the arguments that were used.
+- `parse()`: un-format a formatted string and get back the arguments that were used;
+- `compile()`: compile a format string into a `Template` to format or parse it many times.
 
 The functions above format in the default style for this package (`${var}`), but there are more format types
 available in the `varformat.formats` subpackage.
@@ -25,15 +26,26 @@ Additionally, you may define your own format style that suit your use-case. For
 - `RegexFormatter`: supply a regex that catches variables in the format string to format it;
 - `AbstractFormatter`: more flexible formatter with any logic you need (see docstring).
 """
-__all__ = ["__version__", "AmbiguityError", "AbstractFormatter", "RegexFormatter", "format", "vformat", "parse"]
+__all__ = [
+    "__version__",
+    "AmbiguityError",
+    "AbstractFormatter",
+    "RegexFormatter",
+    "Template",
+    "format",
+    "vformat",
+    "parse",
+    "compile",
+]
 
 import importlib.metadata
 
 __version__ = importlib.metadata.version("varformat")
 
 
-import io
-import itertools
+import functools
+import operator
+import threading
 from abc import ABCMeta, abstractmethod
 
 try:
@@ -43,6 +55,11 @@ except ImportError:
 
 import regex as re
 
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
 
 # Exceptions ===========================================================================================================
 class AmbiguityError(ValueError):
@@ -56,16 +73,15 @@ class AmbiguityError(ValueError):
     """
 
     def __init__(self, message, possibilities: Iterable[dict]):
-        compiled_message = io.StringIO()
-        compiled_message.write(message)
+        compiled_message = [message]
 
         prefix = "\n  could be: "
         for possibility in possibilities:
-            compiled_message.write(prefix)
-            compiled_message.write(str(possibility))
+            compiled_message.append(prefix)
+            compiled_message.append(str(possibility))
             prefix = "\n        or: "
 
-        super().__init__(compiled_message.getvalue())
+        super().__init__("".join(compiled_message))
 
 
 # ======================================================================================================================
@@ -75,21 +91,274 @@ _Location: TypeAlias = Tuple[int, int]
 _References: TypeAlias = Dict[str, List[_Location]]
 """See `AbstractFormatter.references` for more info."""
 
-_Replacement: TypeAlias = Tuple[_Location, str, Any]
-"""See `AbstractFormatter._replacements` for more info."""
+_Occurrences: TypeAlias = Tuple[List[str], List[_Location]]
+"""See `AbstractFormatter._occurrences` for more info."""
+
+_TEMPLATE_CACHE_SIZE = 512
+"""How many compiled templates each formatter keeps for `format`, `vformat`, and `parse`."""
+
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+"""Guards template cache eviction. Lookups do not need the lock."""
+
+_RE2_MIN_LENGTH = 1024
+"""Shortest string for which `parse(..., engine="auto")` prefers `re2`.
+
+`re2` matches in linear time, but has a much higher constant overhead than `regex`. It only pays off on long strings,
+where backtracking through multiple `.*` groups starts to dominate.
+"""
+
+
+class Template:
+    """A format string compiled by a formatting engine, that can be formatted and parsed many times.
+
+    Templates are produced by `AbstractFormatter.compile()` (or the module-level `compile()`). A template only scans its
+    format string once, when it is compiled, so repeated `format`, `vformat`, and `parse` calls do no work to find
+    variables. `Template` provides the same three functions as the formatters, minus the `fmtstring` argument; see
+    docstrings in `AbstractFormatter` for more info.
+    """
+
+    def __init__(
+        self, fmtstring: str, literals: Tuple[str, ...], names: Tuple[str, ...], placeholders: Tuple[str, ...]
+    ):
+        """Create an instance of `Template`. Prefer `AbstractFormatter.compile()` instead of calling this directly.
+
+        `names[i]` is the variable found between `literals[i]` and `literals[i + 1]`, and `placeholders[i]` is the
+        original text of that variable. There is always one more literal than there are variables.
+        """
+        self.fmtstring = fmtstring
+        self._literals = literals
+        self._names = names
+        self._placeholders = placeholders
+        self._unique_names = tuple(dict.fromkeys(names))
+
+        # Output skeleton for `vformat`: literals in even positions, replacements are filled into odd positions
+        self._parts = [None] * (len(literals) + len(names))
+        self._parts[::2] = literals
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.fmtstring!r})"
+
+    # Public methods ---------------------------------------------------------------------------------------------------
+    def format(self, /, **kwargs) -> str:
+        """Format this template, with replacements passed as keyword arguments. See `AbstractFormatter.format`."""
+        return self.vformat(kwargs)
+
+    def vformat(self, /, args: dict, *, partial_ok=False, extra_ok=True, ambiguity_check=False) -> str:
+        """Format this template, with replacements passed as a dictionary. See `AbstractFormatter.vformat`."""
+        literals, names, placeholders = self._literals, self._names, self._placeholders
+        if not names:
+            if not extra_ok and len(args) > 0:
+                raise ValueError(f"unused arguments: {', '.join(args.keys())}")
+            return self.fmtstring
+
+        replacements = self._replacements(args, partial_ok=partial_ok, extra_ok=extra_ok)
+
+        if ambiguity_check:
+            name_last = None
+            replacement_last = None
+            intermediate = ""
+            for literal, name, placeholder, replacement in zip(literals, names, placeholders, replacements):
+                # Concatenating to an empty string reuses `literal` as is, so this only copies text after a placeholder
+                intermediate += literal
+                if name not in args:
+                    # Variable was left unformatted (partial_ok), so its placeholder is just more in-between text
+                    intermediate += placeholder
+                    continue
+
+                if name_last is not None:
+                    self._ambiguity_check(
+                        name_last,
+                        replacement_last,
+                        name,
+                        replacement,
+                        intermediate,
+                        message="refusing to format because parsing would be ambiguous:",
+                    )
+
+                name_last = name
+                replacement_last = replacement
+                intermediate = ""
+
+        parts = self._parts.copy()
+        parts[1::2] = replacements
+        return "".join(parts)
+
+    def parse(self, /, string: str, *, ambiguity_check=True, engine="regex") -> Union[Dict[str, str], None]:
+        """Parse (aka un-format) a string using this template. See `AbstractFormatter.parse`."""
+        literals, names = self._literals, self._names
+
+        regex = self._parse_engine(string, engine)
+
+        if not names:
+            # Nothing to capture, so there is no need to run the regex
+            return {} if string == self.fmtstring else None
+
+        try:
+            match = regex.fullmatch(string)
+        except UnicodeEncodeError:
+            # `re2` matches UTF-8, so it cannot handle lone surrogates (e.g. from `os.fsdecode`) that `regex` accepts
+            if engine != "auto":
+                raise
+            match = self._parse_regex.fullmatch(string)
+
+        if not match:
+            # The text did not match our pattern
+            return None
+
+        # If a variable appears multiple times, its last occurrence wins
+        result = dict(zip(names, match.groups()))
+        if not ambiguity_check:
+            return result
+
+        # Perform an ambiguity check on every pair of neighboring variables and the literal text between them.
+        #
+        # [txt, var, txt, var, txt, var, txt]
+        #      [   ][   ][   ] <- lhs_name, intermediate, rhs_name
+        for lhs_name, intermediate, rhs_name in zip(names, literals[1:], names[1:]):
+            self._ambiguity_check(
+                lhs_name,
+                result[lhs_name],
+                rhs_name,
+                result[rhs_name],
+                intermediate,
+                message="parsing is ambiguous:",
+            )
+
+        return result
+
+    # Implementation details -------------------------------------------------------------------------------------------
+    def _parse_pattern(self, escape) -> str:
+        """A regular expression which would parse a string formatted with this template.
+
+        Every variable occurrence is replaced by its own unnamed capture group, so group N + 1 holds the text of
+        `names[N]`. The pattern carries its own flags (`(?s)`, so that `.` matches newlines), so it needs no
+        engine-specific options. Literal text is escaped with `escape`, which must come from the engine the pattern is
+        compiled with: `regex.escape` backslashes Unicode whitespace, which `re2` rejects.
+        """
+        regex = ["(?s)"]
+        for literal in self._literals[:-1]:
+            regex.append(escape(literal))  # Regex-escape intermediate text
+            # Groups are greedy on purpose: with `ambiguity_check=False`, `parse` is documented to resolve ambiguities
+            # greedily. Lazy groups would not make failed matches any cheaper, since they backtrack through the same
+            # positions; use the `re2` engine for that.
+            regex.append("(.*)")
+        regex.append(escape(self._literals[-1]))
+
+        return "".join(regex)
+
+    def _parse_engine(self, string: str, engine: str):
+        """Pick the compiled parse regex for `engine` (see `AbstractFormatter.parse`)."""
+        if engine == "auto":
+            if _re2 is not None and len(self._names) > 1 and len(string) >= _RE2_MIN_LENGTH:
+                try:
+                    return self._parse_re2
+                except _re2.error:
+                    pass  # Pattern uses something `re2` does not support, `regex` will do
+
+            return self._parse_regex
+
+        if engine == "regex":
+            return self._parse_regex
+        if engine == "re2":
+            if _re2 is None:
+                raise ImportError("parsing with engine 're2' requires the google-re2 package")
+            return self._parse_re2
+
+        raise ValueError(f"unknown regex engine: {engine}")
+
+    @functools.cached_property
+    def _parse_regex(self) -> re.Pattern:
+        """`_parse_pattern`, compiled with the `regex` module.
+
+        Composed on first use and then reused for every following `parse`.
+        """
+        return re.compile(self._parse_pattern(re.escape))
+
+    @functools.cached_property
+    def _parse_re2(self):
+        """`_parse_pattern`, compiled with the `re2` module."""
+        return _re2.compile(self._parse_pattern(_re2.escape))
+
+    def _replacements(self, args: Mapping[str, Any], *, partial_ok, extra_ok) -> List[str]:
+        """Given arguments, produce a list of replacement strings, one for each variable in this template.
+
+        If `partial_ok` is set, variables that have no argument are replaced with their original placeholder text.
+        Each argument is converted to `str` only once, no matter how many times its variable appears.
+        """
+        strings = {}
+
+        for name in self._unique_names:
+            try:
+                replacement = args[name]
+            except KeyError:
+                if partial_ok:
+                    continue
+                raise
+
+            strings[name] = str(replacement)
+
+        # Every key in `strings` is also in `args`, so any extra keys in `args` are unused arguments
+        if not extra_ok and len(args) > len(strings):
+            unused = [name for name in args if name not in strings]
+            raise ValueError(f"unused arguments: {', '.join(unused)}")
+
+        return [strings.get(name, placeholder) for name, placeholder in zip(self._names, self._placeholders)]
+
+    def _ambiguity_check(self, lhs_name, lhs_text, rhs_name, rhs_text, intermediate, message):
+        """Performs an ambiguity check during format for a pair of sequential variables.
+
+        Ambiguity checks are performed on pairs of variables that are next to each other because ambiguities arise when
+        one of the two neighboring arguments contains the entire contents of the text that is inbetween. For example,
+        for a format string `${A}-${B}`, if the replacement text for either A or B contains a dash `-`, then the
+        resulting text would contain two dashes and parsing would be ambiguous.
+
+        :param lhs_name: name of the left side variable
+        :param lhs_text: text of the left side variable
+        :param rhs_name: name of the right side variable
+        :param rhs_text: text of the right side variable
+        :param intermediate: unformatted text between variables
+        """
+        # Most checks find nothing, and `in` is cheaper than `find`, so look up the position only when raising
+        if intermediate in rhs_text:
+            i = rhs_text.find(intermediate)
+            raise AmbiguityError(
+                message,
+                [
+                    {lhs_name: lhs_text, rhs_name: rhs_text},
+                    {
+                        lhs_name: lhs_text + intermediate + rhs_text[:i],
+                        rhs_name: rhs_text[i + len(intermediate) :],
+                    },
+                ],
+            )
+
+        if intermediate in lhs_text:
+            i = lhs_text.find(intermediate)
+            raise AmbiguityError(
+                message,
+                [
+                    {lhs_name: lhs_text, rhs_name: rhs_text},
+                    {
+                        lhs_name: lhs_text[:i],
+                        rhs_name: lhs_text[i + len(intermediate) :] + intermediate + rhs_text,
+                    },
+                ],
+            )
 
 
 class AbstractFormatter(metaclass=ABCMeta):
     """An formatting engine that supports parsing and formatting using a particular style.
 
-    `AbstractFormatter` provides three user-facing functions: `format`, `vformat`, and `parse`.
+    `AbstractFormatter` provides three user-facing functions: `format`, `vformat`, and `parse`, as well as `compile`
+    for turning a format string into a reusable `Template`.
 
     For most usecases, you can either use the default engine (module-level functions `format`, `vformat`, and `parse`),
     import a special pre-packaged engine from `varformat.formats`, or create your own by subclassing this class or the
     `RegexFormatter` implementation.
 
     This is an abstract class. When subclassing, to make the whole thing work you need to implement the `_references`
-    method. See docstring for `_references` for more info.
+    method. See docstring for `_references` for more info. If your formatter finds variables in order, you may also
+    override `_occurrences` to skip building references.
     """
 
     # Abstract methods -------------------------------------------------------------------------------------------------
@@ -103,6 +372,9 @@ class AbstractFormatter(metaclass=ABCMeta):
             `{"A": [(0, 4), (10, 14)], "B": [(5, 9)]}`
         This means that when variable `A` is replaced by value `example`, the value string will replace text at
         positions from 0 to 4 and from 10 to 14.
+
+        The result must depend only on `fmtstring`: it is compiled into a `Template` and cached per formatter. If your
+        formatter has state that changes which variables are found, call `_clear_templates()` after changing it.
         """
 
     # Public methods ---------------------------------------------------------------------------------------------------
@@ -160,41 +432,13 @@ class AbstractFormatter(metaclass=ABCMeta):
 
         ```
         """
-        references = self._references(fmtstring)
-        replacements = self._replacements(references, args, partial_ok=partial_ok, extra_ok=extra_ok)
+        return self.compile(fmtstring).vformat(
+            args, partial_ok=partial_ok, extra_ok=extra_ok, ambiguity_check=ambiguity_check
+        )
 
-        result = io.StringIO()
-        iterator = iter(self._format_iter(fmtstring, replacements))
-
-        name_last = None
-        replacement_last = None
-        try:
-            while True:
-                intermediate = next(iterator)
-                assert isinstance(intermediate, str)
-                result.write(intermediate)
-
-                name, replacement = next(iterator)
-                result.write(replacement)
-
-                if ambiguity_check and name_last is not None:
-                    self._ambiguity_check(
-                        name_last,
-                        replacement_last,
-                        name,
-                        replacement,
-                        intermediate,
-                        message="refusing to format because parsing would be ambiguous:",
-                    )
-
-                name_last = name
-                replacement_last = replacement
-        except StopIteration:
-            pass
-
-        return result.getvalue()
-
-    def parse(self, fmtstring: str, /, string: str, *, ambiguity_check=True) -> Union[Dict[str, str], None]:
+    def parse(
+        self, fmtstring: str, /, string: str, *, ambiguity_check=True, engine="regex"
+    ) -> Union[Dict[str, str], None]:
         """Parse (aka un-format) a string and return a mapping of variable names to their values, or `None` if the
         string did not match the pattern.
 
@@ -204,6 +448,11 @@ class AbstractFormatter(metaclass=ABCMeta):
 
         To avoid ambiguous strings, consider setting `ambiguity_check` to `True` when formatting with `vformat`.
 
+        `engine` selects the regular expression engine used for matching: `"regex"` (the default backtracking engine),
+        or `"re2"`, which matches in linear time but requires the optional `google-re2` package and cannot match strings
+        containing lone surrogates. `"auto"` uses `re2` if it is installed and the string is long enough for
+        backtracking to become expensive, and falls back to `regex` otherwise.
+
         Examples:
         ```
         >>> parse("Hello ${name}!", "Hello Anna!")
@@ -220,162 +469,83 @@ class AbstractFormatter(metaclass=ABCMeta):
 
         ```
         """
-        references = self._references(fmtstring)
-        args = {}
-
-        # Compose a regular expression which would parse the source string
-        for name, i in zip(references, itertools.count()):
-            # Variables will be replaced by a named regex group "_N" where N is the index of the variable in references.
-            # Named regex groups are needed because a single variable may appear multiple times and must match the same
-            # text each time.
-            args[name] = f"(?P<_{i}>.*)"
+        return self.compile(fmtstring).parse(string, ambiguity_check=ambiguity_check, engine=engine)
 
-        replacements = self._replacements(references, args, partial_ok=False, extra_ok=False)
+    def compile(self, fmtstring: str, /) -> Template:
+        """Compile a format string into a `Template`, which can then be formatted or parsed many times.
 
-        # a list of [unformatted text, variable name, unformatted text, ...] for ambiguity checking later.
-        dissection = []
+        Compiling scans the format string once, so that the resulting template does not need to look for variables
+        again. `format`, `vformat`, and `parse` compile format strings automatically, and each formatter caches the last
+        512 format strings it compiled, so calling those functions repeatedly with the same format string is already
+        cheap.
+        Use `compile` if you want to hold on to the template yourself.
 
-        # Resulting regular expression with named capture groups in place of dollar variables
-        regex = io.StringIO()
-        iterator = iter(self._format_iter(fmtstring, replacements))
-        try:
-            while True:
-                intermediate = next(iterator)
-                dissection.append(intermediate)
-                regex.write(re.escape(intermediate))  # Regex-escape intermediate text
-
-                name, replacement = next(iterator)
-                dissection.append(name)
-                regex.write(replacement)
-        except StopIteration:
-            pass
-
-        match = re.fullmatch(regex.getvalue(), string, re.DOTALL)
-        if not match:
-            # The text did not match our pattern
-            return None
-
-        result = {name: match[f"_{i}"] for name, i in zip(references, itertools.count())}
-        if not ambiguity_check:
-            return result
-
-        # Perform an ambiguity check
-        # We need an iterator over all the variables in the text, except the last one because `_ambiguity_check` takes a
-        # variable and the one after it.
-        #
-        # [txt, var, txt, var, txt, var, txt, var, txt]
-        #      [   ]     [   ]     [   ] <- take this range (every var name except last)
-        for i in range(1, len(dissection) - 3, 2):
-            lhs_name = dissection[i]
-            intermediate = dissection[i + 1]
-            rhs_name = dissection[i + 2]  # last var name handled here
-
-            self._ambiguity_check(
-                lhs_name,
-                result[lhs_name],
-                rhs_name,
-                result[rhs_name],
-                intermediate,
-                message="parsing is ambiguous:",
-            )
-
-        return result
+        Examples:
+        ```
+        >>> template = compile("Hello ${name}!")
+        >>> template.format(name="Anna")
+        'Hello Anna!'
+        >>> template.vformat({"name": "Bob"})
+        'Hello Bob!'
+        >>> template.parse("Hello Carol!")
+        {'name': 'Carol'}
 
-    # Implementation details -------------------------------------------------------------------------------------------
-    def _replacements(
-        self, references: _References, args: Mapping[str, Any], *, partial_ok, extra_ok
-    ) -> List[_Replacement]:
-        """Given a list of references and arguments, produce a list of replacements, sorted by their order in the
-        string.
-
-        A replacement is all info needed for a single replacement of variable with value in the format string:
-        1. Location of the text to be replaced (i.e. the substring `${VAR}`)
-        2. Variable name (for error messages, etc.)
-        3. Replacement object (a string or something printable)
+        ```
         """
-        result = []
-        args = dict(args)
+        # The cache lives on the instance, so that formatters need not be hashable and are not kept alive by it
+        templates = self.__dict__.setdefault("_templates", {})
 
-        for name, locations in references.items():
-            try:
-                replacement = args.pop(name)
-            except KeyError:
-                if partial_ok:
-                    continue
-                raise
-
-            result.extend((location, name, replacement) for location in locations)
+        template = templates.get(fmtstring)
+        if template is None:
+            template = self._compile(fmtstring)
+            with _TEMPLATE_CACHE_LOCK:  # Another thread may be evicting from the same cache
+                if len(templates) >= _TEMPLATE_CACHE_SIZE:
+                    del templates[next(iter(templates))]  # Evict the oldest template
+                templates[fmtstring] = template
 
-        if not extra_ok and len(args) > 0:
-            raise ValueError(f"unused arguments: {', '.join(args.keys())}")
+        return template
 
-        result.sort(key=lambda x: x[0][0])
-        return result
-
-    def _ambiguity_check(self, lhs_name, lhs_text, rhs_name, rhs_text, intermediate, message):
-        """Performs an ambiguity check during format for a pair of sequential variables.
-
-        Ambiguity checks are performed on pairs of variables that are next to each other because ambiguities arise when
-        one of the two neighboring arguments contains the entire contents of the text that is inbetween. For example,
-        for a format string `${A}-${B}`, if the replacement text for either A or B contains a dash `-`, then the
-        resulting text would contain two dashes and parsing would be ambiguous.
+    # Implementation details -------------------------------------------------------------------------------------------
+    def _clear_templates(self):
+        """Discard all templates cached by `compile`.
 
-        :param lhs_name: name of the left side variable
-        :param lhs_text: text of the left side variable
-        :param rhs_name: name of the right side variable
-        :param rhs_text: text of the right side variable
-        :param intermediate: unformatted text between variables
+        Call this from subclasses whenever state that affects `_references` (or `_occurrences`) changes.
         """
-        i = rhs_text.find(intermediate)
-        if i != -1:
-            raise AmbiguityError(
-                message,
-                [
-                    {lhs_name: lhs_text, rhs_name: rhs_text},
-                    {
-                        lhs_name: lhs_text + intermediate + rhs_text[:i],
-                        rhs_name: rhs_text[i + len(intermediate) :],
-                    },
-                ],
-            )
-
-        i = lhs_text.find(intermediate)
-        if i != -1:
-            raise AmbiguityError(
-                message,
-                [
-                    {lhs_name: lhs_text, rhs_name: rhs_text},
-                    {
-                        lhs_name: lhs_text[:i],
-                        rhs_name: lhs_text[i + len(intermediate) :] + intermediate + rhs_text,
-                    },
-                ],
-            )
+        self.__dict__.pop("_templates", None)
 
-    def _format_iter(self, fmtstring: str, replacements: Iterable[Tuple[Tuple[int, int], str, str]]):
-        """Yields parts of the output string.
+    def _compile(self, fmtstring: str) -> Template:
+        """Compile a format string into a `Template`, bypassing the cache used by `compile`."""
+        literals = []
+        names = []
+        placeholders = []
 
-        Yield value types alternate between `str` (non-formatted in-between text, even if empty) and Tuple[str, str]
-        (variable name and the corresponding text replacement). Starts with `str` and ends with `str`.
+        prev_end = 0
+        for name, (begin, end) in zip(*self._occurrences(fmtstring)):
+            literals.append(fmtstring[prev_end:begin])
+            names.append(name)
+            placeholders.append(fmtstring[begin:end])
 
-        For a format string "Hello ${A} Goodbye ${B}" will yield:
-        - `"Hello "`
-        - `("A", ...)`
-        - `" Goodbye "`
-        - `("B", ...)`
-        - `""`
+            prev_end = end
 
-        If the format string is empty, will generate a single empty `str`.
-        """
-        prev_end = 0
+        literals.append(fmtstring[prev_end:])
+        return Template(fmtstring, tuple(literals), tuple(names), tuple(placeholders))
 
-        for location, name, replacement_val in replacements:
-            yield fmtstring[prev_end : location[0]]
-            yield (name, str(replacement_val))
+    def _occurrences(self, fmtstring: str) -> _Occurrences:
+        """Produce two parallel lists: names of every variable occurrence in `fmtstring`, and their locations, both
+        sorted by their order in the string.
 
-            prev_end = location[1]
+        Example:
+        Format string `${A}-${B}-${A}` in the default formatter has occurrences:
+            `["A", "B", "A"], [(0, 4), (5, 9), (10, 14)]`
 
-        yield fmtstring[prev_end:]
+        The default implementation flattens and sorts the result of `_references`. Formatters that naturally find
+        variables from left to right may override this method to skip building references altogether.
+        """
+        occurrences = sorted(
+            ((location, name) for name, locations in self._references(fmtstring).items() for location in locations),
+            key=operator.itemgetter(0),
+        )
+        return [name for _, name in occurrences], [location for location, _ in occurrences]
 
 
 class RegexFormatter(AbstractFormatter):
@@ -392,12 +562,36 @@ class RegexFormatter(AbstractFormatter):
         regex should capture the name of the variable. For example, the regex `\${([\w\s]+)}` matches dollar-style
         variables like `${var}`, and capture group 1 returns the name of the variable `var`.
         """
-        self.re_variable = re.compile(variable_regex)
+        self.re_variable = variable_regex
+
+    @property
+    def re_variable(self) -> re.Pattern:
+        """Compiled regular expression that matches variables.
+
+        Accepts both pattern strings and compiled patterns. Assigning a new one discards cached templates.
+        """
+        return self._re_variable
+
+    @re_variable.setter
+    def re_variable(self, value: Union[str, re.Pattern]):
+        self._re_variable = re.compile(value)  # No-op for already compiled patterns
+        self._clear_templates()
+
+    def _occurrences(self, fmtstring: str) -> _Occurrences:
+        names = []
+        spans = []
+
+        # finditer already yields matches from left to right
+        for reference in self.re_variable.finditer(fmtstring):
+            names.append(reference[1])
+            spans.append(reference.span())
+
+        return names, spans
 
     def _references(self, fmtstring: str) -> _References:
         result = {}
 
-        for reference in re.finditer(self.re_variable, fmtstring):
+        for reference in self.re_variable.finditer(fmtstring):
             variable = reference[1]
             locations = result.get(variable, [])
             locations.append((reference.start(), reference.end()))
@@ -413,3 +607,4 @@ from .formats import permissive as _default_engine
 format = _default_engine.format
 vformat = _default_engine.vformat
 parse = _default_engine.parse
+compile = _default_engine.compile
@@ -30,7 +30,7 @@ Examples:
 """
 
 # pylint: disable=cyclic-import
-from . import AbstractFormatter, RegexFormatter, _References
+from . import RegexFormatter
 
 __all__ = ["permissive", "posix_shell", "python"]
 
@@ -41,22 +41,8 @@ Simple variables which use the dollar braces syntax and allow any string inside.
 Used as a default engine in this package.
 """
 
-
-class _PosixFormatter(AbstractFormatter):
-    _formatter_braces = RegexFormatter(r"\${([a-zA-Z_]\w*)}")
-    _formatter_no_braces = RegexFormatter(r"\$([a-zA-Z_]\w*)")
-
-    def _references(self, fmtstring: str) -> _References:
-        part1 = self._formatter_braces._references(fmtstring)  # pylint: disable=protected-access
-        part2 = self._formatter_no_braces._references(fmtstring)  # pylint: disable=protected-access
-
-        result_keys = part1.keys() | part2.keys()
-        result = {k: part1.get(k, []) + part2.get(k, []) for k in result_keys}
-
-        return result
-
-
-posix_shell = _PosixFormatter()
+# Branch reset group `(?|...)` numbers the name as group 1 in both alternatives: `${var}` and `$var`
+posix_shell = RegexFormatter(r"\$(?|{([a-zA-Z_]\w*)}|([a-zA-Z_]\w*))")
 """
 POSIX shell-style variables.
 
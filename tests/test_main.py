@@ -11,7 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import weakref
+
 import pytest
+import regex as re
 import varformat as vf
 from varformat.formats import posix_shell as sh, python as py
 
@@ -45,6 +48,11 @@ def test_missing():
     with pytest.raises(KeyError, match="missing"):
         vf.vformat("${present} ${missing}", {"present": "present"})
 
+    # Unformatted variables are part of the text between their neighbors
+    assert vf.vformat("${a}-${b}-${c}", {"a": 1, "c": 3}, partial_ok=True, ambiguity_check=True) == "1-${b}-3"
+    with pytest.raises(vf.AmbiguityError):
+        vf.vformat("${a}-${b}-${c}", {"a": "1-${b}-", "c": 3}, partial_ok=True, ambiguity_check=True)
+
 
 def test_extra():
     assert vf.format("${a}+${a}=${a}", a=1, b=2, c=3) == "1+1=1"
@@ -60,6 +68,10 @@ def test_extra():
 def test_parse():
     assert vf.parse(">${var}<", ">1<") == {"var": "1"}
     assert vf.parse("${a} ${b}", "1 2") == {"a": "1", "b": "2"}
+    assert vf.parse("hello world", "hello world") == {}
+    assert vf.parse("hello world", "hello") is None
+    assert vf.parse("${a}-${b}", "1\n-\n2") == {"a": "1\n", "b": "\n2"}
+    assert vf.parse("${a}-${b}", "1-2\n", ambiguity_check=False) == {"a": "1", "b": "2\n"}
 
 
 def test_roundtrip():
@@ -96,3 +108,129 @@ def test_python_engine():
     assert py.vformat("{1}", {"1": "a"}) == "{1}"
     assert py.vformat("{1a}", {"1a": "a"}) == "{1a}"
     assert py.vformat("{var space}", {"var space": "a"}) == "{var space}"
+
+
+def test_repeated_calls():
+    # Compiled format strings are cached per engine, so the same string must still format differently in each
+    for _ in range(2):
+        assert vf.format("{a} ${a}", a=1) == "{a} 1"
+        assert py.format("{a} ${a}", a=1) == "1 $1"
+        assert vf.parse("{a} ${a}", "{a} 1") == {"a": "1"}
+        assert py.parse("{a} ${a}", "1 $1") == {"a": "1"}
+
+
+def test_repeated_variable():
+    class Counter:
+        calls = 0
+
+        def __str__(self):
+            Counter.calls += 1
+            return "x"
+
+    assert vf.format("${a}+${a}=${a}", a=Counter()) == "x+x=x"
+    assert Counter.calls == 1
+
+
+def test_compile():
+    template = vf.compile("${a}-${b}")
+    assert isinstance(template, vf.Template)
+    assert template.fmtstring == "${a}-${b}"
+    assert vf.compile("${a}-${b}") is template
+
+    assert template.format(a=1, b=2) == "1-2"
+    assert template.vformat({"a": 1}, partial_ok=True) == "1-${b}"
+    assert template.parse("1-2") == {"a": "1", "b": "2"}
+    assert template.parse("1+2") is None
+
+    assert sh.compile("$a ${b}").format(a=1, b=2) == "1 2"
+    assert py.compile("{a}").parse("1") == {"a": "1"}
+
+
+def test_parse_engine():
+    assert vf.parse("${a}-${b}", "1-2", engine="regex") == {"a": "1", "b": "2"}
+
+    with pytest.raises(ValueError, match="unknown regex engine"):
+        vf.parse("${a}-${b}", "1-2", engine="sre")
+
+
+def test_parse_engine_re2():
+    pytest.importorskip("re2")
+
+    assert vf.parse("${a}-${b}", "1-2", engine="re2") == {"a": "1", "b": "2"}
+    assert vf.parse("${a}\n${b}", "1\n2\n", engine="re2", ambiguity_check=False) == {"a": "1\n2", "b": ""}
+    assert vf.parse("${a}-${b}", "1+2", engine="re2") is None
+
+    long = "x" * 2000
+    assert vf.parse("${a}-${b}.", f"{long}-{long}.", engine="auto") == {"a": long, "b": long}
+    assert vf.parse("${a}-${b}.", f"{long}-{long}", engine="auto") is None
+
+    # re2 cannot encode lone surrogates, so "auto" falls back to regex for them
+    assert vf.parse("${a}-${b}", long + "\ud800-y", engine="auto") == {"a": long + "\ud800", "b": "y"}
+    assert vf.parse("${a}-${b}", long + "\ud800-y") == {"a": long + "\ud800", "b": "y"}
+    with pytest.raises(UnicodeEncodeError):
+        vf.parse("${a}-${b}", long + "\ud800-y", engine="re2")
+
+    # Non-ASCII whitespace in literals must be escaped in a way re2 accepts
+    assert vf.parse("${a}\u00a0${b}", "1\u00a02", engine="re2") == {"a": "1", "b": "2"}
+    assert vf.parse("${a}\u00a0${b}", long + "\u00a0y", engine="auto") == {"a": long, "b": "y"}
+
+
+def test_parse_greedy():
+    assert vf.parse("${a}-${b}-${c}", "1-2-3-4", ambiguity_check=False) == {"a": "1-2", "b": "3", "c": "4"}
+    assert vf.parse("${a} ${b}", "1 2 3", ambiguity_check=False) == {"a": "1 2", "b": "3"}
+
+
+def test_abstract_formatter():
+    class ReverseDictFormatter(vf.AbstractFormatter):
+        # Produces references in reverse order to make sure they are sorted before formatting
+        def _references(self, fmtstring):
+            result = vf.RegexFormatter(r"<(\w+)>")._references(fmtstring)
+            return {name: locations[::-1] for name, locations in reversed(result.items())}
+
+    engine = ReverseDictFormatter()
+    roundtrip(engine, "<a>-<b>-<a>", {"a": "1", "b": "2"}, "1-2-1")
+
+
+def test_template_cache():
+    class UnhashableFormatter(vf.RegexFormatter):
+        def __eq__(self, other):
+            return self is other
+
+    engine = UnhashableFormatter(r"<(\w+)>")
+    roundtrip(engine, "<a>-<b>", {"a": "1", "b": "2"}, "1-2")
+
+    # Cached templates do not keep their formatter alive
+    engine_ref = weakref.ref(engine)
+    del engine
+    assert engine_ref() is None
+
+    # Cached templates are discarded when the variable regex changes
+    engine = vf.RegexFormatter(r"<(\w+)>")
+    assert engine.format("<a> [a]", a=1) == "1 [a]"
+    engine.re_variable = re.compile(r"\[(\w+)\]")
+    assert engine.format("<a> [a]", a=1) == "<a> 1"
+    engine.re_variable = r"<(\w+)>"
+    assert engine.format("<a> [a]", a=1) == "1 [a]"
+
+
+def test_vformat_override():
+    class UpperFormatter(vf.RegexFormatter):
+        def vformat(self, fmtstring, /, args, **kwargs):
+            return super().vformat(fmtstring, {k: str(v).upper() for k, v in args.items()}, **kwargs)
+
+    assert UpperFormatter(r"\${(\w+)}").format("${a}", a="x") == "X"
+
+
+def test_clear_templates():
+    class SwitchingFormatter(vf.AbstractFormatter):
+        def __init__(self):
+            self.engine = vf.RegexFormatter(r"<(\w+)>")
+
+        def _references(self, fmtstring):
+            return self.engine._references(fmtstring)
+
+    engine = SwitchingFormatter()
+    assert engine.format("<a> [a]", a=1) == "1 [a]"
+    engine.engine = vf.RegexFormatter(r"\[(\w+)\]")
+    engine._clear_templates()
+    assert engine.format("<a> [a]", a=1) == "<a> 1"